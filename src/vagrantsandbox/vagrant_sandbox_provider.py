@@ -1,11 +1,19 @@
 import asyncio
+import atexit
+import base64
+import contextvars
+import functools
+import json
 import os
 import shlex
 import shutil
 import subprocess
+import tempfile
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from logging import getLogger
+from logging import DEBUG, getLogger
 from os import getenv
 from pathlib import Path
 from typing import (
@@ -20,8 +28,8 @@ from typing import (
     override,
 )
 
-from contextlib import nullcontext
-from typing import AsyncContextManager
+from contextlib import contextmanager, nullcontext, suppress
+from typing import AsyncContextManager, Iterator
 
 from inspect_ai.util import (
     ExecResult,
@@ -84,6 +92,10 @@ class TimeoutConfig:
     kill_grace: float = 5.0
 
 
+# Name of the snapshot taken right after `vagrant up` when
+# `VagrantSandboxEnvironmentConfig.use_snapshot` is enabled.
+SNAPSHOT_NAME = "clean"
+
 # This value will be used to create directories like eg.
 # `~/.cache/inspect-vagrant-sandbox/...` or equivalent on other
 # operating systems.
@@ -170,7 +182,13 @@ async def destroy_sandbox_vms(sandbox_path: Path) -> None:
 
     logger.info(f"Destroying VMs in {sandbox_path}")
     vagrant = Vagrant(root=str(sandbox_path))
-    result = await vagrant._run_vagrant_command_async(["destroy", "-f"])
+    # The Vagrant instance that opened any ssh master connections may be gone,
+    # so find them from the ssh configs it left in the sandbox directory
+    await asyncio.to_thread(vagrant._load_ssh_configs)
+    await vagrant.close_ssh()
+    result = await vagrant._run_vagrant_command_async(
+        ["destroy", "-f"], max_output_lines=VAGRANT_OUTPUT_TAIL_LINES
+    )
     if result["returncode"] != 0:
         logger.warning(
             f"vagrant destroy returned {result['returncode']}: {result['stderr']}"
@@ -180,9 +198,17 @@ async def destroy_sandbox_vms(sandbox_path: Path) -> None:
 def list_sandbox_directories() -> list[Path]:
     """List all sandbox directories in the cache."""
     base_dir = get_sandbox_cache_dir()
-    if not base_dir.exists():
+    # scandir reports each entry's type from the directory listing itself, so
+    # this doesn't stat every entry the way Path.iterdir() + is_dir() does
+    try:
+        with os.scandir(base_dir) as entries:
+            return [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
         return []
-    return [p for p in base_dir.iterdir() if p.is_dir()]
 
 
 def cleanup_sandbox_directory(path: Path) -> None:
@@ -210,6 +236,142 @@ async def cleanup_sandbox_with_vms(path: Path) -> None:
     await asyncio.to_thread(cleanup_sandbox_directory, path)
 
 
+async def cleanup_sandboxes_with_vms(
+    paths: list[Path],
+) -> list[BaseException | None]:
+    """Clean up several sandbox directories concurrently.
+
+    At most `default_max_subprocesses()` directories are cleaned up at once.
+    Returns the exception raised for each path, or None if it succeeded.
+    """
+    semaphore = asyncio.Semaphore(default_max_subprocesses())
+
+    async def cleanup(path: Path) -> None:
+        async with semaphore:
+            await cleanup_sandbox_with_vms(path)
+
+    results = await asyncio.gather(
+        *(cleanup(path) for path in paths), return_exceptions=True
+    )
+    return [result if isinstance(result, BaseException) else None for result in results]
+
+
+# Seconds an idle multiplexed SSH master connection is kept alive after the
+# last command that used it.
+SSH_CONTROL_PERSIST_SECONDS = 60
+
+# Seconds to wait for `ssh -O exit` to shut down a master connection.
+SSH_EXIT_TIMEOUT_SECONDS = 10
+
+
+@functools.cache
+def _ssh_control_dir() -> Path:
+    """Private (0700) directory for this process's ssh master sockets.
+
+    Created under /tmp rather than `tempfile.gettempdir()`: on macOS that is a
+    long per-user directory under /var/folders, and ssh first binds a socket
+    at "<ControlPath>.<16 random characters>", which would then overflow the
+    104-byte unix socket path limit and make every ssh call fail. The
+    directory is removed when the process exits.
+    """
+    path = Path(tempfile.mkdtemp(prefix="ivs-", dir="/tmp"))
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def _ssh_multiplex_args() -> list[str]:
+    """OpenSSH options to share one connection across ssh calls to a VM.
+
+    The first command to a VM opens a master connection which later commands
+    reuse, skipping the TCP and SSH handshakes on every exec. `%C` is a hash
+    of the local host, remote host, port and user, so each VM gets its own
+    socket.
+    """
+    return [
+        "-o",
+        "ControlMaster=auto",
+        "-o",
+        f"ControlPath={_ssh_control_dir() / '%C'}",
+        "-o",
+        f"ControlPersist={SSH_CONTROL_PERSIST_SECONDS}",
+    ]
+
+
+# Guest-side script for `VagrantSandboxEnvironment.write_files`. Reads one
+# "<base64 path> <base64 contents>" line per file from stdin, so any number of
+# files (with any contents) are written by a single ssh call.
+WRITE_FILES_SCRIPT = (
+    "set -e; "
+    "while read -r path contents; do "
+    'path="$(printf %s "$path" | base64 -d)"; '
+    'mkdir -p "$(dirname "$path")"; '
+    'printf %s "$contents" | base64 -d > "$path"; '
+    "done"
+)
+
+
+# Lines of output kept from long-running, chatty vagrant commands (`up`,
+# `destroy`), whose output is only logged.
+VAGRANT_OUTPUT_TAIL_LINES = 1000
+
+# Bytes read from a process's output at a time when only its tail is kept.
+OUTPUT_READ_SIZE = 64 * 1024
+
+
+async def _communicate_tail(
+    process: asyncio.subprocess.Process, input: bytes | None, max_lines: int
+) -> tuple[bytes, bytes]:
+    """Like `process.communicate()`, but only keep the last lines of output.
+
+    Output is read in chunks as it is produced and split into lines here,
+    rather than with `StreamReader.readline()`, which fails on lines longer
+    than the stream's 64 KiB limit. Memory use is bounded by `max_lines`
+    rather than by the total size of the output (plus the longest line).
+    """
+    stdout: deque[bytes] = deque(maxlen=max_lines)
+    stderr: deque[bytes] = deque(maxlen=max_lines)
+
+    async def drain(stream: asyncio.StreamReader | None, sink: deque[bytes]) -> None:
+        if stream is None:
+            return
+        partial = bytearray()
+        while chunk := await stream.read(OUTPUT_READ_SIZE):
+            if b"\n" not in chunk:
+                partial += chunk
+                continue
+            *lines, rest = chunk.split(b"\n")
+            lines[0] = bytes(partial) + lines[0]
+            sink.extend(line + b"\n" for line in lines)
+            partial = bytearray(rest)
+        if partial:
+            sink.append(bytes(partial))
+
+    async def feed() -> None:
+        if process.stdin is None:
+            return
+        # Like communicate(), ignore the process exiting without reading all
+        # of its input
+        try:
+            if input:
+                process.stdin.write(input)
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    await asyncio.gather(
+        feed(), drain(process.stdout, stdout), drain(process.stderr, stderr)
+    )
+    await process.wait()
+    return b"".join(stdout), b"".join(stderr)
+
+
+@functools.cache
+def _ssh_executable() -> str:
+    """Absolute path to the OpenSSH client, falling back to a PATH lookup."""
+    return shutil.which("ssh") or "ssh"
+
+
 class ExecCommandReturn(TypedDict):
     returncode: int
     stdout: str
@@ -219,8 +381,37 @@ class ExecCommandReturn(TypedDict):
 class Vagrant(BaseVagrant):
     logger = getLogger(__name__)
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # `vagrant ssh-config` output written to disk, keyed by VM name, as
+        # (config file, ssh host alias)
+        self._ssh_configs: dict[str | None, tuple[Path, str]] = {}
+        self._ssh_config_lock = asyncio.Lock()
+        # python-vagrant's lifecycle methods run in executor threads, so rather
+        # than touching `_ssh_configs` there they bump this counter, and the
+        # cache is cleared on the event loop once it no longer matches.
+        self._lifecycle_changes = 0
+        self._ssh_configs_changes = 0
+        # Shared `vagrant status` lookup for get_vm_names
+        self._vm_names: asyncio.Future[list[str | None]] | None = None
+
     async def get_vm_names(self) -> list[str | None]:
-        """Get list of VM names defined in the Vagrantfile."""
+        """Get list of VM names defined in the Vagrantfile.
+
+        Concurrent callers share a single `vagrant status` call, and the names
+        are cached for the lifetime of this instance: they come from the
+        Vagrantfile, so bringing VMs up or down doesn't change them.
+        """
+        if self._vm_names is None:
+            self._vm_names = asyncio.ensure_future(self._get_vm_names())
+
+        vm_names = await asyncio.shield(self._vm_names)
+        if not vm_names:
+            # Don't cache a failed lookup
+            self._vm_names = None
+        return vm_names
+
+    async def _get_vm_names(self) -> list[str | None]:
         try:
             # Use python-vagrant's built-in status method
             status_info = await _run_in_executor(self.status)
@@ -237,6 +428,7 @@ class Vagrant(BaseVagrant):
         args: list[str | None],
         input: str | bytes | None = None,
         timeout: int | float | TimeoutConfig | None = None,
+        max_output_lines: int | None = None,
     ) -> ExecCommandReturn:
         """
         Run a vagrant command and return everything, not just stdout.
@@ -247,6 +439,38 @@ class Vagrant(BaseVagrant):
         input: Optional input to pass to stdin.
         timeout: Optional timeout - can be a number (seconds) or TimeoutConfig
             for fine-grained control over grace periods.
+        max_output_lines: Optional limit on the lines of stdout and stderr
+            kept; only the last lines are returned.
+        """
+        return await self._run_command_async(
+            self._make_vagrant_command(args),
+            input=input,
+            timeout=timeout,
+            cwd=self.root,
+            max_output_lines=max_output_lines,
+        )
+
+    async def _run_command_async(
+        self,
+        command: list[str],
+        input: str | bytes | None = None,
+        timeout: int | float | TimeoutConfig | None = None,
+        cwd: str | None = None,
+        max_output_lines: int | None = None,
+    ) -> ExecCommandReturn:
+        """
+        Run a command and return everything, not just stdout.
+
+        command: The full command line, e.g. ['vagrant', 'status'] or
+        ['ssh', '-F', 'ssh-config', 'default', 'ls'].
+        input: Optional input to pass to stdin.
+        timeout: Optional timeout - can be a number (seconds) or TimeoutConfig
+            for fine-grained control over grace periods.
+        cwd: Optional working directory. Leave unset when the command doesn't
+            need one: with an absolute executable path and no cwd, CPython
+            can start the process with posix_spawn instead of fork/exec.
+        max_output_lines: Optional limit on the lines of stdout and stderr
+            kept; only the last lines are returned.
         """
         # Extract timeout configuration
         timeout_val: float | None
@@ -258,10 +482,10 @@ class Vagrant(BaseVagrant):
             timeout_val = float(timeout) if timeout is not None else None
             terminate_grace = 5.0
             kill_grace = 5.0
-        # Make subprocess command
-        command = self._make_vagrant_command(args)
-        self.logger.debug(f"Vagrant command: {command}")
-        self.logger.debug(f"Working directory: {self.root}")
+        if timeout_val is not None and timeout_val <= 0:
+            raise ValueError(f"timeout must be positive, got {timeout_val}")
+        self.logger.debug(f"Command: {command}")
+        self.logger.debug(f"Working directory: {cwd}")
         self.logger.debug(
             f"Environment variables: {dict(self.env) if self.env else 'None'}"
         )
@@ -276,33 +500,33 @@ class Vagrant(BaseVagrant):
             stdin=stdin_mode,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            cwd=self.root,
+            cwd=cwd,
             env=self.env,
         )
 
+        input_bytes = input.encode("utf-8") if isinstance(input, str) else input
         try:
-            communicate_coro = process.communicate(
-                input=input.encode("utf-8") if isinstance(input, str) else input
-            )
-            if timeout_val is not None:
-                if timeout_val <= 0:
-                    raise ValueError(f"timeout must be positive, got {timeout_val}")
-                stdout, stderr = await asyncio.wait_for(
-                    communicate_coro, timeout=float(timeout_val)
-                )
-            else:
-                stdout, stderr = await communicate_coro
-        except asyncio.TimeoutError:
+            # asyncio.timeout(None) never expires
+            async with asyncio.timeout(timeout_val):
+                if max_output_lines is None:
+                    stdout, stderr = await process.communicate(input=input_bytes)
+                else:
+                    stdout, stderr = await _communicate_tail(
+                        process, input_bytes, max_output_lines
+                    )
+        except TimeoutError:
             # Try graceful termination first
             process.terminate()
             try:
-                await asyncio.wait_for(process.wait(), timeout=terminate_grace)
-            except asyncio.TimeoutError:
+                async with asyncio.timeout(terminate_grace):
+                    await process.wait()
+            except TimeoutError:
                 # Force kill if termination didn't work
                 process.kill()
                 try:
-                    await asyncio.wait_for(process.wait(), timeout=kill_grace)
-                except asyncio.TimeoutError:
+                    async with asyncio.timeout(kill_grace):
+                        await process.wait()
+                except TimeoutError:
                     # Give up waiting - process is likely orphaned
                     self.logger.error(
                         "Process did not respond to kill signal, abandoning."
@@ -313,7 +537,21 @@ class Vagrant(BaseVagrant):
                     )
             raise TimeoutError(
                 f"Command execution timed out after {timeout_val} seconds."
-            )
+            ) from None
+        except BaseException:
+            # Don't leave the process running, or unreaped, if reading its
+            # output failed or this task was cancelled
+            if process.returncode is None:
+                with suppress(ProcessLookupError):
+                    process.kill()
+                try:
+                    async with asyncio.timeout(kill_grace):
+                        await process.wait()
+                except TimeoutError:
+                    self.logger.error(
+                        "Process did not respond to kill signal, abandoning."
+                    )
+            raise
 
         assert process.returncode is not None, (
             "returncode should be set after communicate()"
@@ -329,6 +567,44 @@ class Vagrant(BaseVagrant):
             "returncode": process.returncode,
         }
 
+    async def _ssh_config(self, vm_name: str | None) -> tuple[Path, str]:
+        """Get the ssh config file and host alias for a VM.
+
+        `vagrant ssh-config` is only run the first time a VM is used; the
+        output is written next to the Vagrantfile and reused for every later
+        ssh call, so those calls don't have to start Vagrant at all.
+        """
+        async with self._ssh_config_lock:
+            changes = self._lifecycle_changes
+            if changes != self._ssh_configs_changes:
+                self._ssh_configs.clear()
+                self._ssh_configs_changes = changes
+            if vm_name in self._ssh_configs:
+                return self._ssh_configs[vm_name]
+
+            args: list[str | None] = ["ssh-config", vm_name]
+            result = await self._run_vagrant_command_async(args)
+            host = next(
+                (
+                    line.split()[1]
+                    for line in result["stdout"].splitlines()
+                    if line.startswith("Host ")
+                ),
+                None,
+            )
+            if result["returncode"] != 0 or host is None:
+                raise subprocess.CalledProcessError(
+                    result["returncode"],
+                    self._make_vagrant_command(args),
+                    result["stdout"],
+                    result["stderr"],
+                )
+            config_file = Path(self.root) / f"ssh-config-{host}"
+            await asyncio.to_thread(config_file.write_text, result["stdout"])
+
+            self._ssh_configs[vm_name] = (config_file, host)
+            return config_file, host
+
     @override
     def ssh(
         self,
@@ -341,17 +617,131 @@ class Vagrant(BaseVagrant):
         """
         Execute a command via ssh on the vm specified.
 
+        Runs OpenSSH directly using the VM's cached `vagrant ssh-config`,
+        rather than going through `vagrant ssh`.
+
         command: The command to execute via ssh.
-        extra_ssh_args: Corresponds to '--' option in the vagrant ssh command
+        extra_ssh_args: Extra argument passed to ssh before the host.
         input: Optional input to pass to stdin of the command.
         timeout: Optional timeout - can be a number (seconds) or TimeoutConfig.
         Returns the output of running the command.
         """
-        cmd = ["ssh", vm_name, "--no-tty", "--command", command]
+        return self._ssh(vm_name, command, extra_ssh_args, input, timeout)
+
+    async def _ssh(
+        self,
+        vm_name: str | None,
+        command: str | None,
+        extra_ssh_args: str | None,
+        input: str | bytes | None,
+        timeout: int | float | TimeoutConfig | None,
+    ) -> ExecCommandReturn:
+        config_file, host = await self._ssh_config(vm_name)
+
+        cmd = [_ssh_executable(), "-F", str(config_file), *_ssh_multiplex_args()]
         if extra_ssh_args is not None:
-            cmd += ["--", extra_ssh_args]
+            cmd.append(extra_ssh_args)
+        cmd.append(host)
+        if command is not None:
+            cmd.append(command)
+
+        return await self._run_command_async(cmd, input=input, timeout=timeout)
+
+    def _ssh_exit_commands(self) -> list[list[str]]:
+        """Commands that shut down the ssh master connection to each VM."""
+        return [
+            [
+                _ssh_executable(),
+                "-F",
+                str(config_file),
+                *_ssh_multiplex_args(),
+                "-O",
+                "exit",
+                host,
+            ]
+            # Copy first: this may run in an executor thread while the event
+            # loop adds to the cache
+            for config_file, host in list(self._ssh_configs.values())
+        ]
+
+    def _load_ssh_configs(self) -> None:
+        """Add the ssh configs written to this root by `_ssh_config` to the cache."""
+        for config_file in Path(self.root).glob("ssh-config-*"):
+            host = config_file.name.removeprefix("ssh-config-")
+            self._ssh_configs.setdefault(host, (config_file, host))
+
+    async def close_ssh(self) -> None:
+        """Shut down the multiplexed ssh master connection to each VM.
+
+        Also forgets the cached ssh configs, so they are fetched again on the
+        next ssh call.
+        """
+        for cmd in self._ssh_exit_commands():
+            try:
+                result = await self._run_command_async(
+                    cmd, timeout=SSH_EXIT_TIMEOUT_SECONDS
+                )
+            except TimeoutError:
+                self.logger.warning(f"Timed out closing ssh master: {cmd}")
+                continue
+            if result["returncode"] != 0:
+                self.logger.debug(f"No ssh master to close: {result['stderr']}")
+        self._ssh_configs.clear()
+
+    def _close_ssh_sync(self) -> None:
+        """Blocking version of `close_ssh`, for python-vagrant's sync methods.
+
+        These usually run in an executor thread, so the cached ssh configs are
+        only marked stale here; `_ssh_config` drops them on the event loop.
+        """
+        for cmd in self._ssh_exit_commands():
+            try:
+                # A non-zero exit just means there was no master to close
+                subprocess.run(
+                    cmd,
+                    check=False,
+                    capture_output=True,
+                    env=self.env,
+                    timeout=SSH_EXIT_TIMEOUT_SECONDS,
+                )
+            except subprocess.TimeoutExpired:
+                self.logger.warning(f"Timed out closing ssh master: {cmd}")
+        self._lifecycle_changes += 1
+
+    @contextmanager
+    def _changing_ssh_address(self) -> Iterator[None]:
+        """Drop the ssh master and cached ssh configs around a lifecycle change.
+
+        python-vagrant's lifecycle methods can change a VM's ssh address (e.g.
+        vagrant-qemu's ssh_auto_correct picks a new port on boot). The cache is
+        invalidated again afterwards, since an ssh call made on the event loop
+        while the operation ran may have cached the old address.
+        """
+        self._close_ssh_sync()
+        try:
+            yield
+        finally:
+            self._lifecycle_changes += 1
+
+    @override
+    def up(self, *args: Any, **kwargs: Any) -> Any:
+        with self._changing_ssh_address():
+            return super().up(*args, **kwargs)
+
+    @override
+    def reload(self, *args: Any, **kwargs: Any) -> Any:
+        with self._changing_ssh_address():
+            return super().reload(*args, **kwargs)
+
+    @override
+    def halt(self, *args: Any, **kwargs: Any) -> Any:
+        with self._changing_ssh_address():
+            return super().halt(*args, **kwargs)
 
-        return self._run_vagrant_command_async(cmd, input=input, timeout=timeout)
+    @override
+    def destroy(self, *args: Any, **kwargs: Any) -> Any:
+        with self._changing_ssh_address():
+            return super().destroy(*args, **kwargs)
 
 
 T = TypeVar("T")
@@ -369,6 +759,10 @@ class VagrantSandboxEnvironmentConfig(BaseModel, frozen=True):
         default=(),
         description="Environment variables available to the Vagrantfile during vagrant commands. Accepts dict[str, str] or tuple of (key, value) pairs.",
     )
+    use_snapshot: bool = Field(
+        default=False,
+        description="Snapshot the VMs right after `vagrant up` so they can be reset with `restore_snapshot()` instead of being destroyed and re-provisioned. Requires a Vagrant provider with snapshot support (e.g. libvirt, VirtualBox).",
+    )
 
     @field_validator("vagrantfile_env_vars", mode="before")
     @classmethod
@@ -378,9 +772,35 @@ class VagrantSandboxEnvironmentConfig(BaseModel, frozen=True):
         return v
 
 
+# Shared pool for blocking python-vagrant calls, so threads are reused across
+# calls and event loops instead of each loop growing its own default executor.
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="vagrant-sync",
+)
+atexit.register(_EXECUTOR.shutdown)
+
+
+@functools.lru_cache(maxsize=256)
+def _deserialize_config(
+    config_json: str, vagrantfile_path_env: str | None
+) -> VagrantSandboxEnvironmentConfig:
+    """Build a config from its JSON form, reusing instances for repeat configs.
+
+    Configs are frozen, so samples with identical configs can safely share one
+    instance instead of each being validated again.
+    """
+    return VagrantSandboxEnvironmentConfig(**json.loads(config_json))
+
+
 async def _run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
-    """Run a synchronous function in a thread pool."""
-    return await asyncio.to_thread(func, *args, **kwargs)
+    """Run a synchronous function in the shared thread pool."""
+    loop = asyncio.get_running_loop()
+    # Like asyncio.to_thread, run in a copy of the caller's context
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _EXECUTOR, functools.partial(ctx.run, func, *args, **kwargs)
+    )
 
 
 @sandboxenv(name="vagrant")
@@ -490,19 +910,25 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
             except Exception as read_error:
                 cls.logger.error(f"Could not read Vagrantfile: {read_error}")
 
-            # First check current status before trying to start
-            try:
-                initial_status = await vagrant._run_vagrant_command_async(["status"])
-                cls.logger.debug(f"Initial VM status: {initial_status['stdout']}")
-            except Exception as status_error:
-                cls.logger.debug(
-                    f"Could not get initial status (this is normal for new VMs): {status_error}"
-                )
+            # First check current status before trying to start. This is only
+            # logged, so skip the extra `vagrant status` unless debugging.
+            if cls.logger.isEnabledFor(DEBUG):
+                try:
+                    initial_status = await vagrant._run_vagrant_command_async(
+                        ["status"]
+                    )
+                    cls.logger.debug(f"Initial VM status: {initial_status['stdout']}")
+                except Exception as status_error:
+                    cls.logger.debug(
+                        f"Could not get initial status (this is normal for new VMs): {status_error}"
+                    )
 
             # Use our async method to capture stdout/stderr on failure
             # Throttle concurrent vagrant up operations to prevent resource exhaustion
             async with _startup_semaphore():
-                up_result = await vagrant._run_vagrant_command_async(["up"])
+                up_result = await vagrant._run_vagrant_command_async(
+                    ["up"], max_output_lines=VAGRANT_OUTPUT_TAIL_LINES
+                )
             cls.logger.info("All VMs started successfully")
             if up_result["stdout"]:
                 cls.logger.debug(f"Vagrant up stdout: {up_result['stdout']}")
@@ -549,6 +975,20 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
 
             raise e
 
+        if config.use_snapshot:
+            snapshot_args: list[str | None] = ["snapshot", "save", SNAPSHOT_NAME]
+            snapshot_result = await vagrant._run_vagrant_command_async(snapshot_args)
+            if snapshot_result["returncode"] != 0:
+                cls.logger.error(
+                    f"Failed to save snapshot: {snapshot_result['stderr']}"
+                )
+                raise subprocess.CalledProcessError(
+                    snapshot_result["returncode"],
+                    vagrant._make_vagrant_command(snapshot_args),
+                    snapshot_result["stdout"],
+                    snapshot_result["stderr"],
+                )
+
         sandboxes: dict[str, SandboxEnvironment] = {}
 
         # Determine which VM should be the default
@@ -616,30 +1056,42 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
     ) -> None:
         if not interrupted:
             # Deduplicate environments - the same env may be added under multiple keys
-            # (e.g., "default" and the actual VM name)
-            seen_ids: set[int] = set()
-            for env in environments.values():
-                if isinstance(env, VagrantSandboxEnvironment):
-                    env_id = id(env)
-                    if env_id in seen_ids:
-                        continue
-                    seen_ids.add(env_id)
-
-                    if not env.sandbox_dir.path.exists():
-                        cls.logger.warning(
-                            f"Sandbox directory already deleted: {env.sandbox_dir.path}"
-                        )
-                        continue
-
-                    result = await env.vagrant._run_vagrant_command_async(
-                        ["destroy", "-f"]
-                    )
-                    if result["returncode"] != 0:
-                        cls.logger.warning(
-                            f"vagrant destroy returned {result['returncode']}: {result['stderr']}"
-                        )
+            # (e.g., "default" and the actual VM name), and every VM of a sample
+            # shares one sandbox directory, which `vagrant destroy` tears down as a whole
+            unique_envs = {
+                id(env.sandbox_dir): env
+                for env in environments.values()
+                if isinstance(env, VagrantSandboxEnvironment)
+            }
+
+            # Destroy independent sandbox directories concurrently
+            results = await asyncio.gather(
+                *(cls._destroy_environment(env) for env in unique_envs.values()),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+    @classmethod
+    async def _destroy_environment(cls, env: "VagrantSandboxEnvironment") -> None:
+        """Destroy the VMs in an environment's sandbox directory and remove it."""
+        if not env.sandbox_dir.path.exists():
+            cls.logger.warning(
+                f"Sandbox directory already deleted: {env.sandbox_dir.path}"
+            )
+            return
+
+        await env.vagrant.close_ssh()
+        result = await env.vagrant._run_vagrant_command_async(
+            ["destroy", "-f"], max_output_lines=VAGRANT_OUTPUT_TAIL_LINES
+        )
+        if result["returncode"] != 0:
+            cls.logger.warning(
+                f"vagrant destroy returned {result['returncode']}: {result['stderr']}"
+            )
 
-                    await env.sandbox_dir.cleanup()
+        await env.sandbox_dir.cleanup()
 
     @classmethod
     @override
@@ -657,11 +1109,10 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
 
         if cleanup:
             cls.logger.info(f"Cleaning up {len(directories)} sandbox(es)")
-            for path in directories:
-                try:
-                    await cleanup_sandbox_with_vms(path)
-                except Exception as e:
-                    cls.logger.error(f"Failed to clean up {path}: {e}")
+            errors = await cleanup_sandboxes_with_vms(directories)
+            for path, error in zip(directories, errors):
+                if error is not None:
+                    cls.logger.error(f"Failed to clean up {path}: {error}")
         else:
             cls.logger.info(f"Sandbox cache directory: {cache_dir}")
             for path in directories:
@@ -684,16 +1135,17 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
                 print("Nothing to clean up.")
                 return
 
+            # Sandboxes are cleaned up concurrently, so report once all are done
+            print("Cleaning up...", flush=True)
+            errors = await cleanup_sandboxes_with_vms(directories)
             removed = 0
-            for path in directories:
-                print(f"  Cleaning up: {path.name}...", end=" ", flush=True)
-                try:
-                    await cleanup_sandbox_with_vms(path)
-                    print("done")
+            for path, error in zip(directories, errors):
+                if error is None:
+                    print(f"  {path.name}: done")
                     removed += 1
-                except Exception as e:
-                    print(f"FAILED: {e}")
-                    cls.logger.error(f"Failed to clean up {path}: {e}")
+                else:
+                    print(f"  {path.name}: FAILED: {error}")
+                    cls.logger.error(f"Failed to clean up {path}: {error}")
 
             print(f"Cleaned up {removed}/{len(directories)} sandboxes")
         else:
@@ -717,7 +1169,16 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
     @classmethod
     @override
     def config_deserialize(cls, config: dict[str, Any]) -> BaseModel:
-        return VagrantSandboxEnvironmentConfig(**config)
+        try:
+            # Field order doesn't matter, so sort the top-level keys; nested
+            # values (e.g. env var order) are kept as given
+            config_json = json.dumps(dict(sorted(config.items())))
+        except TypeError:
+            # Not JSON-serializable, so can't be cached; let pydantic report it
+            return VagrantSandboxEnvironmentConfig(**config)
+        # The default vagrantfile_path comes from the environment, so it is
+        # part of the cache key
+        return _deserialize_config(config_json, getenv("VAGRANTFILE_PATH"))
 
     @override
     async def exec(
@@ -750,19 +1211,38 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
 
     @override
     async def write_file(self, file: str, contents: str | bytes) -> None:
-        contents_str: str
-        if isinstance(contents, bytes):
-            contents_str = contents.decode()
-        elif isinstance(contents, str):
-            contents_str = contents
-        else:
-            assert_never(contents)  # type: ignore[arg-type]
+        await self.write_files([(file, contents)])
 
-        command = f"printf %s {shlex.quote(contents_str)} > {shlex.quote(file)}"
-        result = await self.vagrant.ssh(vm_name=self.vm_name, command=command)
+    async def write_files(self, files: list[tuple[str, str | bytes]]) -> None:
+        """Write several files to the VM with a single ssh call.
+
+        Paths and contents are base64-encoded and streamed to the guest on
+        stdin, so nothing is interpolated into the shell command. Parent
+        directories are created as needed.
+        """
+        lines = []
+        for file, contents in files:
+            contents_bytes: bytes
+            if isinstance(contents, str):
+                contents_bytes = contents.encode()
+            elif isinstance(contents, bytes):
+                contents_bytes = contents
+            else:
+                assert_never(contents)  # type: ignore[arg-type]
+
+            path_b64 = base64.b64encode(file.encode()).decode()
+            contents_b64 = base64.b64encode(contents_bytes).decode()
+            lines.append(f"{path_b64} {contents_b64}\n")
+
+        result = await self.vagrant.ssh(
+            vm_name=self.vm_name, command=WRITE_FILES_SCRIPT, input="".join(lines)
+        )
         if result["returncode"] != 0:
             raise subprocess.CalledProcessError(
-                result["returncode"], command, result["stdout"]
+                result["returncode"],
+                WRITE_FILES_SCRIPT,
+                result["stdout"],
+                result["stderr"],
             )
 
     @overload
@@ -784,6 +1264,30 @@ class VagrantSandboxEnvironment(SandboxEnvironment):
             return result["stdout"]
         return result["stdout"].encode("utf-8")
 
+    async def restore_snapshot(self) -> None:
+        """Reset this VM to the snapshot taken after `vagrant up`.
+
+        Much faster than destroying and re-creating the VM. Only available when
+        the sandbox was created with `use_snapshot=True`.
+        """
+        args: list[str | None] = [
+            "snapshot",
+            "restore",
+            self.vm_name,
+            SNAPSHOT_NAME,
+            "--no-provision",
+        ]
+        # The guest's side of any open ssh connection is lost on restore
+        await self.vagrant.close_ssh()
+        result = await self.vagrant._run_vagrant_command_async(args)
+        if result["returncode"] != 0:
+            raise subprocess.CalledProcessError(
+                result["returncode"],
+                self.vagrant._make_vagrant_command(args),
+                result["stdout"],
+                result["stderr"],
+            )
+
     @override
     async def connection(self, *, user: str | None = None) -> SandboxConnection:
         """Information required to connect to sandbox environment.
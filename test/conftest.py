@@ -9,6 +9,39 @@ Test Categories:
 
 import os
 
+import pytest
+import pytest_asyncio
+
+from vagrantsandbox.vagrant_sandbox_provider import (
+    VagrantSandboxEnvironment,
+    VagrantSandboxEnvironmentConfig,
+)
+
+# Cores given to each pytest-xdist worker when INSPECT_PIN_XDIST_WORKERS=1
+CORES_PER_WORKER = 2
+
+
+def pin_xdist_worker(worker_id: str) -> None:
+    """Pin this xdist worker to its own group of cores.
+
+    Child processes (vagrant, ssh, qemu) inherit the affinity, so parallel VM
+    tests don't contend for the same CPUs. Worker gwN gets cores [2N, 2N+1]
+    of the cores available to pytest, wrapping around if there are more
+    workers than core groups. No-op on platforms without sched_setaffinity
+    (e.g. macOS).
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+
+    cores = sorted(os.sched_getaffinity(0))
+    groups = len(cores) // CORES_PER_WORKER
+    if groups == 0:
+        return
+
+    index = int(worker_id.removeprefix("gw")) % groups
+    start = index * CORES_PER_WORKER
+    os.sched_setaffinity(0, cores[start : start + CORES_PER_WORKER])
+
 
 def pytest_configure(config):
     """Register custom markers and configure test isolation."""
@@ -17,6 +50,8 @@ def pytest_configure(config):
     worker_id = os.environ.get("PYTEST_XDIST_WORKER")
     if worker_id:
         os.environ["INSPECT_SANDBOX_CACHE_SUFFIX"] = f"worker-{worker_id}"
+        if os.environ.get("INSPECT_PIN_XDIST_WORKERS") == "1":
+            pin_xdist_worker(worker_id)
 
     config.addinivalue_line(
         "markers", "unit: Fast unit tests with no external dependencies"
@@ -30,6 +65,50 @@ def pytest_configure(config):
     )
 
 
+# Only override pytest-asyncio's event_loop_policy fixture when uvloop is
+# requested; overriding it at all is deprecated in newer pytest-asyncio.
+if os.environ.get("INSPECT_TEST_UVLOOP") == "1":
+
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async tests on uvloop.
+
+        uvloop spawns subprocesses through libuv, which is faster than the
+        default loop for the many short ssh/vagrant commands the tests run. It
+        is not a declared dependency, so it must be installed separately.
+        """
+        import uvloop  # type: ignore[import-not-found]
+
+        return uvloop.EventLoopPolicy()
+
+
+BASIC_CONFIG = VagrantSandboxEnvironmentConfig(
+    vagrantfile_path=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.basic"
+    )
+)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def shared_sandbox():
+    """Boot one Vagrantfile.basic VM for the whole session and tear it down at the end.
+
+    Tests using this fixture must run on the session event loop and, under
+    pytest-xdist, be in the "Vagrantfile.basic" xdist group so they all land
+    on the worker that owns the VM. Tests share the VM's state, so each should
+    namespace any files it creates.
+    """
+    sandboxes = await VagrantSandboxEnvironment.sample_init(
+        "shared", BASIC_CONFIG, {"sample_id": "shared"}
+    )
+    try:
+        yield sandboxes["default"]
+    finally:
+        await VagrantSandboxEnvironment.sample_cleanup(
+            "shared", BASIC_CONFIG, sandboxes, interrupted=False
+        )
+
+
 # Example usage patterns in comments:
 # pytest -m unit                    # Run only fast unit tests
 # pytest -m vm_required            # Run only VM infrastructure tests
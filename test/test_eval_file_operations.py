@@ -9,16 +9,17 @@ Run with: pytest test/test_eval_file_operations.py -v -s -m vm_required
 Or: inspect eval test/test_eval_file_operations.py::task_name --model mockllm/model
 """
 
-import asyncio
 import os
 import sys
 import pytest
 
 from inspect_ai import Task, eval, task
 from inspect_ai.dataset import Sample
-from inspect_ai.model import ChatMessageAssistant
+from inspect_ai.log import EvalLog
+from inspect_ai.model import ChatMessageTool, ModelOutput, get_model
 from inspect_ai.scorer import includes
-from inspect_ai.solver import generate
+from inspect_ai.solver import generate, use_tools
+from inspect_ai.tool import bash
 from inspect_ai.util import SandboxEnvironmentSpec
 
 # Import after adding to path if needed
@@ -29,9 +30,9 @@ from vagrantsandbox.vagrant_sandbox_provider import (
 )
 
 
-def get_basic_vagrantfile():
-    """Get path to Vagrantfile.basic."""
-    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.basic")
+BASIC_VAGRANTFILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.basic"
+)
 
 
 # ==============================================================================
@@ -53,11 +54,11 @@ def read_os_release():
                 id="os-check",
             )
         ],
-        plan=[generate()],
+        plan=[use_tools(bash()), generate()],
         scorer=includes(),
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
-            VagrantSandboxEnvironmentConfig(vagrantfile_path=get_basic_vagrantfile()),
+            VagrantSandboxEnvironmentConfig(vagrantfile_path=BASIC_VAGRANTFILE),
         ),
         max_messages=5,
     )
@@ -80,11 +81,11 @@ def read_multiple_system_files():
                 id="system-info",
             )
         ],
-        plan=[generate()],
+        plan=[use_tools(bash()), generate()],
         scorer=includes(),
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
-            VagrantSandboxEnvironmentConfig(vagrantfile_path=get_basic_vagrantfile()),
+            VagrantSandboxEnvironmentConfig(vagrantfile_path=BASIC_VAGRANTFILE),
         ),
         max_messages=15,
     )
@@ -105,218 +106,128 @@ def system_exploration_workflow():
                 id="system-analysis",
             )
         ],
-        plan=[generate()],
+        plan=[use_tools(bash()), generate()],
         scorer=includes(),
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
-            VagrantSandboxEnvironmentConfig(vagrantfile_path=get_basic_vagrantfile()),
+            VagrantSandboxEnvironmentConfig(vagrantfile_path=BASIC_VAGRANTFILE),
         ),
         max_messages=20,
     )
 
 
+# ==============================================================================
+# MOCKLLM SCRIPTS
+# ==============================================================================
+
+# Built once at import and reused, rather than rebuilding the scripted model
+# turns on every test run.
+
+MOCK_MODEL = "mockllm/model"
+
+
+def _bash(cmd):
+    return ModelOutput.for_tool_call(
+        model=MOCK_MODEL, tool_name="bash", tool_arguments={"cmd": cmd}
+    )
+
+
+_OS_RELEASE_OUTPUTS = [
+    _bash("cat /etc/os-release"),
+    ModelOutput.from_content(
+        model=MOCK_MODEL, content="This is Ubuntu 22.04.5 LTS (Jammy Jellyfish)."
+    ),
+]
+
+_MULTIPLE_FILE_READS_OUTPUTS = [
+    _bash("cat /etc/os-release"),
+    _bash("cat /etc/hostname"),
+    _bash("cat /proc/cpuinfo"),
+    ModelOutput.from_content(model=MOCK_MODEL, content="Ubuntu 22.04 system."),
+]
+
+_MIXED_WORKFLOW_OUTPUTS = [
+    _bash("pwd"),
+    _bash("whoami"),
+    _bash("cat /etc/os-release"),
+    _bash("uname -a"),
+    _bash("cat /etc/hostname"),
+    ModelOutput.from_content(model=MOCK_MODEL, content="Ubuntu system, vagrant user."),
+]
+
+
 # ==============================================================================
 # PYTEST TESTS WITH MOCKLLM
 # ==============================================================================
 
+# Each eval sets a time_limit, so a hung tool call ends the sample (and fails
+# the tool-result assertions) rather than blocking CI until the job timeout.
+
+
+def assert_tool_calls_succeeded(log: EvalLog, expected_calls: int) -> list[str]:
+    """Check that every scripted bash call ran in the VM; return their outputs."""
+    assert log.samples, "Eval should log its sample"
+    tool_messages = [
+        message
+        for message in log.samples[0].messages
+        if isinstance(message, ChatMessageTool)
+    ]
+    assert len(tool_messages) == expected_calls
+    for message in tool_messages:
+        assert message.error is None, f"{message.function} failed: {message.error}"
+    return [message.text for message in tool_messages]
+
 
 @pytest.mark.vm_required
-@pytest.mark.asyncio
-async def test_eval_read_system_file():
+def test_eval_read_system_file():
     """Test reading system file via Inspect + MockLLM."""
     eval_task = read_os_release()
-    model_name = "mockllm/model"
-
-    result = await asyncio.wait_for(
-        asyncio.to_thread(
-            eval,
-            eval_task,
-            model=model_name,
-            model_args={
-                "choices": [
-                    # First: call bash tool with cat command
-                    [
-                        ChatMessageAssistant(
-                            content="Checking OS version...",
-                            tool_calls=[
-                                {
-                                    "id": "call_1",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /etc/os-release"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    # Second: provide answer
-                    [
-                        ChatMessageAssistant(
-                            content="This is Ubuntu 22.04.5 LTS (Jammy Jellyfish).",
-                        )
-                    ],
-                ]
-            },
-        ),
-        timeout=180.0,
+
+    result = eval(
+        eval_task,
+        model=get_model(MOCK_MODEL, custom_outputs=_OS_RELEASE_OUTPUTS),
+        time_limit=180,
     )
 
     assert result[0].status == "success", "Eval should complete successfully"
+    [os_release] = assert_tool_calls_succeeded(result[0], expected_calls=1)
+    assert "Ubuntu" in os_release
 
 
 @pytest.mark.vm_required
-@pytest.mark.asyncio
-async def test_eval_multiple_file_reads():
+def test_eval_multiple_file_reads():
     """Test multiple file read operations in sequence using MockLLM."""
     eval_task = read_multiple_system_files()
-    model_name = "mockllm/model"
-
-    result = await asyncio.wait_for(
-        asyncio.to_thread(
-            eval,
-            eval_task,
-            model=model_name,
-            model_args={
-                "choices": [
-                    # Read /etc/os-release
-                    [
-                        ChatMessageAssistant(
-                            content="Checking OS...",
-                            tool_calls=[
-                                {
-                                    "id": "c1",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /etc/os-release"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    # Read /etc/hostname
-                    [
-                        ChatMessageAssistant(
-                            content="Checking hostname...",
-                            tool_calls=[
-                                {
-                                    "id": "c2",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /etc/hostname"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    # Read /proc/cpuinfo
-                    [
-                        ChatMessageAssistant(
-                            content="Checking CPU...",
-                            tool_calls=[
-                                {
-                                    "id": "c3",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /proc/cpuinfo"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    # Final answer
-                    [ChatMessageAssistant(content="Ubuntu 22.04 system.")],
-                ]
-            },
-        ),
-        timeout=120.0,
+
+    result = eval(
+        eval_task,
+        model=get_model(MOCK_MODEL, custom_outputs=_MULTIPLE_FILE_READS_OUTPUTS),
+        time_limit=120,
     )
 
     assert result[0].status == "success"
+    os_release, hostname, cpuinfo = assert_tool_calls_succeeded(
+        result[0], expected_calls=3
+    )
+    assert "Ubuntu" in os_release
+    assert hostname.strip()
+    assert "processor" in cpuinfo
 
 
 @pytest.mark.vm_required
-@pytest.mark.asyncio
-async def test_eval_mixed_command_workflow():
+def test_eval_mixed_command_workflow():
     """Test file reads interspersed with other bash commands."""
     eval_task = system_exploration_workflow()
-    model_name = "mockllm/model"
-
-    result = await asyncio.wait_for(
-        asyncio.to_thread(
-            eval,
-            eval_task,
-            model=model_name,
-            model_args={
-                "choices": [
-                    [
-                        ChatMessageAssistant(
-                            content="Checking location...",
-                            tool_calls=[
-                                {
-                                    "id": "c1",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "pwd"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    [
-                        ChatMessageAssistant(
-                            content="Checking user...",
-                            tool_calls=[
-                                {
-                                    "id": "c2",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "whoami"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    [
-                        ChatMessageAssistant(
-                            content="Checking OS...",
-                            tool_calls=[
-                                {
-                                    "id": "c3",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /etc/os-release"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    [
-                        ChatMessageAssistant(
-                            content="Checking kernel...",
-                            tool_calls=[
-                                {
-                                    "id": "c4",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "uname -a"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    [
-                        ChatMessageAssistant(
-                            content="Checking hostname...",
-                            tool_calls=[
-                                {
-                                    "id": "c5",
-                                    "function": "bash",
-                                    "arguments": {"cmd": "cat /etc/hostname"},
-                                    "type": "function",
-                                }
-                            ],
-                        )
-                    ],
-                    [ChatMessageAssistant(content="Ubuntu system, vagrant user.")],
-                ]
-            },
-        ),
-        timeout=180.0,
+
+    result = eval(
+        eval_task,
+        model=get_model(MOCK_MODEL, custom_outputs=_MIXED_WORKFLOW_OUTPUTS),
+        time_limit=180,
     )
 
     assert result[0].status == "success"
+    outputs = assert_tool_calls_succeeded(result[0], expected_calls=5)
+    assert "Ubuntu" in outputs[2]
 
 
 # ==============================================================================
@@ -16,6 +16,10 @@ from vagrantsandbox.vagrant_sandbox_provider import (
     VagrantSandboxEnvironmentConfig,
 )  # noqa: F401
 
+BASIC_VAGRANTFILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.basic"
+)
+
 
 @task
 def task_for_test() -> Task:
@@ -36,36 +40,34 @@ def task_for_test() -> Task:
         # sandbox="vagrant",
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
-            VagrantSandboxEnvironmentConfig(
-                vagrantfile_path=(os.path.dirname(os.path.abspath(__file__)))
-                + "/Vagrantfile.basic"
-            ),
+            VagrantSandboxEnvironmentConfig(vagrantfile_path=BASIC_VAGRANTFILE),
         ),
     )
 
 
+# Built once at import rather than on every test run
+_UNAME_OUTPUTS = [
+    ModelOutput.for_tool_call(
+        model="mockllm/model",
+        tool_name="bash",
+        tool_arguments={"cmd": "uname -a"},
+        # Extra quotes no longer needed: shlex.join() now handles
+        # shell escaping (previously ' '.join() required manual quoting)
+    ),
+    ModelOutput.for_tool_call(
+        model="mockllm/model",
+        tool_name="submit",
+        tool_arguments={"answer": "42"},
+    ),
+]
+
+
 @pytest.mark.vm_required
 @pytest.mark.inspect_eval
 def test_inspect_eval() -> None:
     eval_logs = eval(
         tasks=[task_for_test()],
-        model=get_model(
-            "mockllm/model",
-            custom_outputs=[
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="bash",
-                    tool_arguments={"cmd": "uname -a"},
-                    # Extra quotes no longer needed: shlex.join() now handles
-                    # shell escaping (previously ' '.join() required manual quoting)
-                ),
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="submit",
-                    tool_arguments={"answer": "42"},
-                ),
-            ],
-        ),
+        model=get_model("mockllm/model", custom_outputs=_UNAME_OUTPUTS),
         log_level="trace",
     )
 
@@ -16,6 +16,10 @@ from vagrantsandbox.vagrant_sandbox_provider import (
     VagrantSandboxEnvironmentConfig,
 )
 
+MULTI_VAGRANTFILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.multi"
+)
+
 
 @task
 def multi_vm_task() -> Task:
@@ -36,8 +40,7 @@ def multi_vm_task() -> Task:
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
             VagrantSandboxEnvironmentConfig(
-                vagrantfile_path=(os.path.dirname(os.path.abspath(__file__)))
-                + "/Vagrantfile.multi",
+                vagrantfile_path=MULTI_VAGRANTFILE,
                 # Note: primary_vm_name will be "attacker" + unique suffix at runtime
                 primary_vm_name="attacker",
             ),
@@ -45,27 +48,28 @@ def multi_vm_task() -> Task:
     )
 
 
+# Built once at import rather than on every test run
+_HOSTNAME_OUTPUTS = [
+    ModelOutput.for_tool_call(
+        model="mockllm/model",
+        tool_name="bash",
+        tool_arguments={"cmd": "hostname"},
+    ),
+    ModelOutput.for_tool_call(
+        model="mockllm/model",
+        tool_name="submit",
+        tool_arguments={"answer": "attacker"},
+    ),
+]
+
+
 @pytest.mark.vm_required
 @pytest.mark.inspect_eval
 def test_multi_vm_config():
     """Test that multi-VM configuration works correctly."""
     eval_logs = eval(
         tasks=[multi_vm_task()],
-        model=get_model(
-            "mockllm/model",
-            custom_outputs=[
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="bash",
-                    tool_arguments={"cmd": "hostname"},
-                ),
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="submit",
-                    tool_arguments={"answer": "attacker"},
-                ),
-            ],
-        ),
+        model=get_model("mockllm/model", custom_outputs=_HOSTNAME_OUTPUTS),
         log_level="trace",
     )
 
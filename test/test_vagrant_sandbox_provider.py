@@ -1,10 +1,14 @@
 import asyncio
+import base64
 import os
 import subprocess
+import threading
+from contextlib import suppress
 from unittest.mock import AsyncMock, Mock, patch
 import pytest
 
 from pathlib import Path
+from pydantic import ValidationError
 from inspect_ai.util._concurrency import init_concurrency
 
 from vagrantsandbox.vagrant_sandbox_provider import (
@@ -14,8 +18,14 @@ from vagrantsandbox.vagrant_sandbox_provider import (
     SandboxDirectory,
     SandboxUnrecoverableError,
     TimeoutConfig,
+    VAGRANT_OUTPUT_TAIL_LINES,
+    _EXECUTOR,
     _run_in_executor,
+    _ssh_control_dir,
+    _ssh_multiplex_args,
+    destroy_sandbox_vms,
     _get_max_vagrant_startups,
+    list_sandbox_directories,
     _startup_semaphore,
 )
 
@@ -26,6 +36,7 @@ def mock_vagrant():
     """Create a mock Vagrant instance."""
     vagrant = Mock(spec=Vagrant)
     vagrant.ssh = AsyncMock()
+    vagrant.close_ssh = AsyncMock()
     vagrant.up = Mock()
     vagrant.destroy = Mock()
     return vagrant
@@ -95,6 +106,18 @@ def mock_sandbox_patches():
         }
 
 
+@pytest.fixture
+def cached_ssh_config():
+    """Pretend `vagrant ssh-config` has already been fetched for every VM."""
+    with patch.object(
+        Vagrant,
+        "_ssh_config",
+        new_callable=AsyncMock,
+        return_value=(Path("/tmp/test/ssh-config-default"), "default"),
+    ) as mock_ssh_config:
+        yield mock_ssh_config
+
+
 @pytest.fixture(autouse=True)
 def mock_vagrant_for_unit_tests(request):
     """Auto-mock vagrant executable for unit tests."""
@@ -133,6 +156,22 @@ class MockAsyncProcess:
         self._resist_kill = resist_kill
         self._killed = False
         self._terminated = False
+        self.stdin = None
+
+    @staticmethod
+    def _stream(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return reader
+
+    @property
+    def stdout(self):
+        return self._stream(self._stdout)
+
+    @property
+    def stderr(self):
+        return self._stream(self._stderr)
 
     async def communicate(self, input=None):
         if self._hang_forever:
@@ -199,7 +238,108 @@ class TestVagrant:
 
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_ssh_command(self):
+    async def test_run_vagrant_command_async_keeps_output_tail(self):
+        """Test that max_output_lines keeps only the last lines of output."""
+        stdout = "".join(f"line {i}\n" for i in range(100))
+        mock_process = MockAsyncProcess(returncode=0, stdout=stdout, stderr="err\n")
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root="/tmp/test")
+            result = await vagrant._run_vagrant_command_async(
+                ["up"], max_output_lines=2
+            )
+
+            assert result["returncode"] == 0
+            assert result["stdout"] == "line 98\nline 99\n"
+            assert result["stderr"] == "err\n"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_vagrant_command_async_tail_long_lines(self):
+        """Test that max_output_lines copes with lines over the stream limit."""
+        long_line = "x" * (256 * 1024)
+        stdout = f"first\n{long_line}\nlast"
+        mock_process = MockAsyncProcess(returncode=0, stdout=stdout)
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root="/tmp/test")
+            result = await vagrant._run_vagrant_command_async(
+                ["up"], max_output_lines=2
+            )
+
+            assert result["stdout"] == f"{long_line}\nlast"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_vagrant_command_async_tail_ignores_broken_stdin(self):
+        """Test that a process exiting before reading its input isn't an error."""
+        mock_process = MockAsyncProcess(returncode=0, stdout="done\n")
+        mock_process.stdin = Mock()
+        mock_process.stdin.write.side_effect = BrokenPipeError
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root="/tmp/test")
+            result = await vagrant._run_vagrant_command_async(
+                ["up"], input="ignored", max_output_lines=10
+            )
+
+            assert result["stdout"] == "done\n"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_vagrant_command_async_kills_process_on_error(self):
+        """Test that the process is killed and reaped if reading output fails."""
+        mock_process = MockAsyncProcess()
+        mock_process.returncode = None  # still running
+        mock_process.communicate = AsyncMock(side_effect=ValueError("boom"))
+        mock_process.wait = AsyncMock()
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root="/tmp/test")
+            with pytest.raises(ValueError, match="boom"):
+                await vagrant._run_vagrant_command_async(["status"])
+
+        assert mock_process._killed is True
+        mock_process.wait.assert_awaited_once()
+
+    @pytest.mark.unit
+    def test_ssh_control_path_fits_unix_socket_limit(self):
+        """Test that the ssh ControlPath is private and fits in a socket address."""
+        [control_path] = [
+            arg.removeprefix("ControlPath=")
+            for arg in _ssh_multiplex_args()
+            if arg.startswith("ControlPath=")
+        ]
+        assert Path(control_path).parent == _ssh_control_dir()
+        assert _ssh_control_dir().stat().st_mode & 0o777 == 0o700
+
+        # %C expands to a 40 character hex digest, and ssh binds the master
+        # socket at "<ControlPath>.<16 random characters>" before renaming it.
+        # sun_path is 104 bytes on macOS (108 on Linux), including the NUL.
+        expanded = control_path.replace("%C", "0" * 40)
+        assert len(expanded.encode()) + 17 < 104
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_destroy_sandbox_vms_closes_ssh_masters(self, tmp_path):
+        """Test that cleanup closes ssh masters left by another Vagrant instance."""
+        (tmp_path / ".vagrant").mkdir()
+        (tmp_path / "ssh-config-default").write_text("Host default\n")
+
+        with patch(
+            "asyncio.create_subprocess_exec",
+            side_effect=[MockAsyncProcess(), MockAsyncProcess()],
+        ) as mock_exec:
+            await destroy_sandbox_vms(tmp_path)
+
+        exit_cmd, destroy_cmd = [call.args for call in mock_exec.call_args_list]
+        assert exit_cmd[-3:] == ("-O", "exit", "default")
+        assert str(tmp_path / "ssh-config-default") in exit_cmd
+        assert destroy_cmd[-2:] == ("destroy", "-f")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_command(self, cached_ssh_config):
         """Test SSH command construction and execution."""
         mock_process = MockAsyncProcess(returncode=0, stdout="command output")
 
@@ -212,13 +352,152 @@ class TestVagrant:
             assert result["returncode"] == 0
             assert result["stdout"] == "command output"
 
-            # Verify SSH command structure
+            # Verify ssh is run directly with the cached config, not via vagrant
             mock_exec.assert_called_once()
+            args, kwargs = mock_exec.call_args
+            assert Path(args[0]).name == "ssh"
+            assert args[1:3] == ("-F", "/tmp/test/ssh-config-default")
+            # No cwd, so CPython can use posix_spawn
+            assert kwargs["cwd"] is None
+            assert args[-2:] == ("default", "ls -la")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_fetches_ssh_config_once(self, tmp_path):
+        """Test that `vagrant ssh-config` only runs on the first ssh call."""
+        ssh_config = "Host default\n  HostName 127.0.0.1\n  Port 50022\n"
+
+        with patch(
+            "asyncio.create_subprocess_exec",
+            side_effect=[
+                MockAsyncProcess(stdout=ssh_config),
+                MockAsyncProcess(stdout="first"),
+                MockAsyncProcess(stdout="second"),
+            ],
+        ) as mock_exec:
+            vagrant = Vagrant(root=str(tmp_path))
+            await vagrant.ssh(command="true")
+            result = await vagrant.ssh(command="true")
+
+            assert result["stdout"] == "second"
+            commands = [call.args for call in mock_exec.call_args_list]
+            assert commands[0] == ("/usr/bin/vagrant", "ssh-config")
+            assert all(Path(command[0]).name == "ssh" for command in commands[1:])
+            assert (tmp_path / "ssh-config-default").read_text() == ssh_config
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_config_failure(self, tmp_path):
+        """Test that a failed `vagrant ssh-config` raises CalledProcessError."""
+        mock_process = MockAsyncProcess(returncode=1, stderr="not created")
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root=str(tmp_path))
+
+            with pytest.raises(subprocess.CalledProcessError):
+                await vagrant.ssh(command="true")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_config_without_host(self, tmp_path):
+        """Test that `vagrant ssh-config` output with no Host line is an error."""
+        mock_process = MockAsyncProcess(returncode=0, stdout="A warning banner\n")
+
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            vagrant = Vagrant(root=str(tmp_path))
+
+            with pytest.raises(subprocess.CalledProcessError) as exc_info:
+                await vagrant.ssh(command="true")
+
+        assert exc_info.value.stdout == "A warning banner\n"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_destroy_forgets_ssh_config(self, mock_subprocess_patches, tmp_path):
+        """Test that destroy() closes the ssh master and drops the cached config."""
+        vagrant = Vagrant(root=str(tmp_path))
+        vagrant._ssh_configs[None] = (tmp_path / "ssh-config-default", "default")
+
+        await _run_in_executor(vagrant.destroy)
+
+        args = mock_subprocess_patches["run"].call_args.args[0]
+        assert args[-3:] == ["-O", "exit", "default"]
+        mock_subprocess_patches["check_call"].assert_called_once()
+
+        # The next ssh call fetches `vagrant ssh-config` again
+        ssh_config = "Host default-new\n  HostName 127.0.0.1\n"
+        with patch(
+            "asyncio.create_subprocess_exec",
+            return_value=MockAsyncProcess(stdout=ssh_config),
+        ):
+            _, host = await vagrant._ssh_config(None)
+        assert host == "default-new"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_config_cached_during_reload_is_dropped(self, tmp_path):
+        """Test that an ssh config fetched while reload() runs isn't kept."""
+        vagrant = Vagrant(root=str(tmp_path))
+        reload_started = threading.Event()
+        finish_reload = threading.Event()
+
+        def slow_reload(*args, **kwargs):
+            reload_started.set()
+            finish_reload.wait(timeout=5)
+
+        with patch("vagrant.Vagrant.reload", side_effect=slow_reload):
+            reload = asyncio.ensure_future(_run_in_executor(vagrant.reload))
+            await asyncio.to_thread(reload_started.wait, 5)
+
+            # Another sample's exec looks up the VM mid-reload
+            with patch(
+                "asyncio.create_subprocess_exec",
+                return_value=MockAsyncProcess(stdout="Host old\n"),
+            ):
+                _, host = await vagrant._ssh_config(None)
+            assert host == "old"
+
+            finish_reload.set()
+            await reload
+
+        with patch(
+            "asyncio.create_subprocess_exec",
+            return_value=MockAsyncProcess(stdout="Host new\n"),
+        ):
+            _, host = await vagrant._ssh_config(None)
+        assert host == "new"
+
+    @pytest.mark.unit
+    def test_destroy_survives_ssh_exit_timeout(self, mock_subprocess_patches):
+        """Test that a hung `ssh -O exit` doesn't block destroy()."""
+        vagrant = Vagrant(root="/tmp/test")
+        vagrant._ssh_configs[None] = (Path("/tmp/test/ssh-config-default"), "default")
+        mock_subprocess_patches["run"].side_effect = subprocess.TimeoutExpired(
+            "ssh", 10
+        )
+
+        vagrant.destroy()
+
+        assert "timeout" in mock_subprocess_patches["run"].call_args.kwargs
+        mock_subprocess_patches["check_call"].assert_called_once()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ssh_uses_connection_multiplexing(self, cached_ssh_config):
+        """Test that SSH options for a shared master connection are passed."""
+        mock_process = MockAsyncProcess(returncode=0, stdout="command output")
+
+        with patch(
+            "asyncio.create_subprocess_exec", return_value=mock_process
+        ) as mock_exec:
+            vagrant = Vagrant(root="/tmp/test")
+            await vagrant.ssh(vm_name="default", command="ls -la")
+
             args, _ = mock_exec.call_args
-            assert "ssh" in args
-            assert "default" in args
-            assert "--command" in args
-            assert "ls -la" in args
+            ssh_args = list(args)
+            assert "ControlMaster=auto" in ssh_args
+            assert any(arg.startswith("ControlPath=") for arg in ssh_args)
+            assert any(arg.startswith("ControlPersist=") for arg in ssh_args)
 
 
 class TestVagrantSandboxEnvironment:
@@ -254,6 +533,42 @@ class TestVagrantSandboxEnvironment:
             assert isinstance(result["default"], VagrantSandboxEnvironment)
             mock_sandbox_patches["to_thread"].assert_called()
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sample_init_multi_vm_single_up(
+        self, mock_subprocess_patches, mock_sandbox_patches
+    ):
+        """Test that all VMs of a multi-VM Vagrantfile start with one `vagrant up`."""
+        config = VagrantSandboxEnvironmentConfig(
+            vagrantfile_path="/test/Vagrantfile.multi", primary_vm_name="attacker"
+        )
+        with (
+            patch.object(
+                Vagrant,
+                "get_vm_names",
+                new_callable=AsyncMock,
+                return_value=["target", "attacker"],
+            ),
+            patch(
+                "vagrantsandbox.vagrant_sandbox_provider.Vagrant._run_vagrant_command_async"
+            ) as mock_async_vagrant,
+        ):
+            mock_async_vagrant.return_value = {
+                "returncode": 0,
+                "stdout": "",
+                "stderr": "",
+            }
+
+            result = await VagrantSandboxEnvironment.sample_init(
+                "test_task", config, {}
+            )
+
+            commands = [call.args[0] for call in mock_async_vagrant.call_args_list]
+            assert [command for command in commands if command[0] == "up"] == [["up"]]
+            assert list(result) == ["default", "target", "attacker"]
+            assert result["default"] is result["attacker"]
+            assert {env.vm_name for env in result.values()} == {"target", "attacker"}
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_sample_init_vagrant_up_failure(
@@ -274,6 +589,79 @@ class TestVagrantSandboxEnvironment:
                     "test_task", sample_config, {}
                 )
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sample_init_saves_snapshot(
+        self, mock_subprocess_patches, mock_sandbox_patches
+    ):
+        """Test that use_snapshot saves a snapshot after vagrant up."""
+        config = VagrantSandboxEnvironmentConfig(
+            vagrantfile_path="/test/Vagrantfile.basic", use_snapshot=True
+        )
+        with patch(
+            "vagrantsandbox.vagrant_sandbox_provider.Vagrant._run_vagrant_command_async"
+        ) as mock_async_vagrant:
+            mock_async_vagrant.return_value = {
+                "returncode": 0,
+                "stdout": "",
+                "stderr": "",
+            }
+
+            await VagrantSandboxEnvironment.sample_init("test_task", config, {})
+
+            commands = [call.args[0] for call in mock_async_vagrant.call_args_list]
+            assert commands.index(["up"]) < commands.index(
+                ["snapshot", "save", "clean"]
+            )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sample_init_without_snapshot(
+        self, sample_config, mock_subprocess_patches, mock_sandbox_patches
+    ):
+        """Test that no snapshot is taken by default."""
+        with patch(
+            "vagrantsandbox.vagrant_sandbox_provider.Vagrant._run_vagrant_command_async"
+        ) as mock_async_vagrant:
+            mock_async_vagrant.return_value = {
+                "returncode": 0,
+                "stdout": "",
+                "stderr": "",
+            }
+
+            await VagrantSandboxEnvironment.sample_init("test_task", sample_config, {})
+
+            commands = [call.args[0] for call in mock_async_vagrant.call_args_list]
+            assert not any(command[0] == "snapshot" for command in commands)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_restore_snapshot(self, mock_vagrant, mock_sandbox_dir):
+        """Test restoring a VM to its post-boot snapshot."""
+        mock_vagrant._run_vagrant_command_async = AsyncMock(
+            return_value={"returncode": 0, "stdout": "", "stderr": ""}
+        )
+        env = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant, "default")
+
+        await env.restore_snapshot()
+
+        mock_vagrant.close_ssh.assert_called_once()
+        mock_vagrant._run_vagrant_command_async.assert_called_once_with(
+            ["snapshot", "restore", "default", "clean", "--no-provision"]
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_restore_snapshot_failure(self, mock_vagrant, mock_sandbox_dir):
+        """Test that a failed restore raises CalledProcessError."""
+        mock_vagrant._run_vagrant_command_async = AsyncMock(
+            return_value={"returncode": 1, "stdout": "", "stderr": "no snapshot"}
+        )
+        env = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant)
+
+        with pytest.raises(subprocess.CalledProcessError):
+            await env.restore_snapshot()
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_sample_cleanup_success(
@@ -293,11 +681,72 @@ class TestVagrantSandboxEnvironment:
             "test_task", None, environments, interrupted=False
         )
 
+        mock_vagrant.close_ssh.assert_called_once()
         mock_vagrant._run_vagrant_command_async.assert_called_once_with(
-            ["destroy", "-f"]
+            ["destroy", "-f"], max_output_lines=VAGRANT_OUTPUT_TAIL_LINES
         )
         mock_sandbox_dir.cleanup.assert_called_once()
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sample_cleanup_parallel(self):
+        """Test that sandboxes are destroyed concurrently."""
+
+        in_flight = 0
+        peak_in_flight = 0
+        all_started = asyncio.Event()
+
+        async def blocking_destroy(*args, **kwargs):
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            if in_flight == 2:
+                all_started.set()
+            # Sequential destroys would never see both in flight, so don't
+            # wait forever for the other one
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(all_started.wait(), timeout=5)
+            in_flight -= 1
+            return {"returncode": 0, "stdout": "", "stderr": ""}
+
+        environments = {}
+        for name in ("first", "second"):
+            vagrant = Mock(spec=Vagrant)
+            vagrant.close_ssh = AsyncMock()
+            vagrant._run_vagrant_command_async = AsyncMock(side_effect=blocking_destroy)
+            sandbox_dir = Mock(spec=SandboxDirectory)
+            sandbox_dir.path = Mock(exists=Mock(return_value=True))
+            sandbox_dir.cleanup = AsyncMock()
+            environments[name] = VagrantSandboxEnvironment(sandbox_dir, vagrant)
+
+        await VagrantSandboxEnvironment.sample_cleanup(
+            "test_task", None, environments, interrupted=False
+        )
+        assert peak_in_flight == 2
+
+        for env in environments.values():
+            env.sandbox_dir.cleanup.assert_called_once()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sample_cleanup_multi_vm_destroys_once(
+        self, mock_vagrant, mock_sandbox_dir
+    ):
+        """Test that VMs sharing a sandbox directory are destroyed once."""
+        mock_vagrant._run_vagrant_command_async = AsyncMock(
+            return_value={"returncode": 0, "stdout": "", "stderr": ""}
+        )
+        attacker = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant, "attacker")
+        victim = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant, "victim")
+        environments = {"default": attacker, "attacker": attacker, "victim": victim}
+
+        await VagrantSandboxEnvironment.sample_cleanup(
+            "test_task", None, environments, interrupted=False
+        )
+
+        mock_vagrant._run_vagrant_command_async.assert_called_once()
+        mock_sandbox_dir.cleanup.assert_called_once()
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_sample_cleanup_interrupted(self, mock_vagrant, mock_sandbox_dir):
@@ -395,8 +844,27 @@ class TestVagrantSandboxEnvironment:
         await env.write_file("/tmp/test.txt", "test content")
 
         mock_vagrant.ssh.assert_called_once()
-        call_args = mock_vagrant.ssh.call_args
-        assert "printf %s 'test content' > /tmp/test.txt" in call_args[1]["command"]
+        path, contents = mock_vagrant.ssh.call_args[1]["input"].split()
+        assert base64.b64decode(path) == b"/tmp/test.txt"
+        assert base64.b64decode(contents) == b"test content"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_write_files_batched(self, mock_vagrant, mock_sandbox_dir):
+        """Test that several files are written with a single ssh call."""
+        env = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant)
+        mock_vagrant.ssh.return_value = {"returncode": 0, "stdout": "", "stderr": ""}
+        files = [(f"/tmp/dir {i}/test.txt", f"content '{i}'\n") for i in range(5)]
+
+        await env.write_files(files)
+
+        mock_vagrant.ssh.assert_called_once()
+        lines = mock_vagrant.ssh.call_args[1]["input"].splitlines()
+        written = [
+            tuple(base64.b64decode(field).decode() for field in line.split())
+            for line in lines
+        ]
+        assert written == files
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -419,9 +887,11 @@ class TestVagrantSandboxEnvironment:
         env = VagrantSandboxEnvironment(mock_sandbox_dir, mock_vagrant)
         mock_vagrant.ssh.return_value = {"returncode": 0, "stdout": "", "stderr": ""}
 
-        await env.write_file("/tmp/test.txt", b"test content")
+        await env.write_file("/tmp/test.txt", b"\x00\xfftest content")
 
         mock_vagrant.ssh.assert_called_once()
+        _, contents = mock_vagrant.ssh.call_args[1]["input"].split()
+        assert base64.b64decode(contents) == b"\x00\xfftest content"
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -486,6 +956,33 @@ class TestVagrantSandboxEnvironment:
             assert mock_cleanup.call_count == 2
 
 
+class TestListSandboxDirectories:
+    """Test listing sandbox directories in the cache."""
+
+    @pytest.mark.unit
+    def test_lists_only_directories(self, tmp_path, monkeypatch):
+        """Test that only real directories are listed, not files or symlinks."""
+        monkeypatch.setenv("INSPECT_SANDBOX_CACHE_DIR", str(tmp_path))
+        for i in range(3):
+            (tmp_path / f"sandbox-{i}").mkdir()
+        (tmp_path / "stray-file").touch()
+        (tmp_path / "link").symlink_to(tmp_path / "sandbox-0")
+
+        directories = list_sandbox_directories()
+
+        assert sorted(path.name for path in directories) == [
+            "sandbox-0",
+            "sandbox-1",
+            "sandbox-2",
+        ]
+
+    @pytest.mark.unit
+    def test_missing_cache_dir(self, tmp_path, monkeypatch):
+        """Test that a missing cache directory lists no sandboxes."""
+        monkeypatch.setenv("INSPECT_SANDBOX_CACHE_DIR", str(tmp_path / "missing"))
+        assert list_sandbox_directories() == []
+
+
 class TestRunInExecutor:
     """Test the _run_in_executor utility function."""
 
@@ -511,6 +1008,20 @@ class TestRunInExecutor:
         result = await _run_in_executor(sync_func, 5, y=3)
         assert result == 15
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_in_executor_shares_pool(self):
+        """Test that calls run on the shared pool, not the loop's default one."""
+        thread_names = await asyncio.gather(
+            *(
+                _run_in_executor(lambda: threading.current_thread().name)
+                for _ in range(100)
+            )
+        )
+
+        assert all(name.startswith("vagrant-sync") for name in thread_names)
+        assert len(set(thread_names)) <= _EXECUTOR._max_workers
+
 
 class TestVagrantSandboxEnvironmentConfig:
     """Test the configuration class."""
@@ -536,6 +1047,27 @@ class TestVagrantSandboxEnvironmentConfig:
         assert isinstance(config, VagrantSandboxEnvironmentConfig)
         assert config.vagrantfile_path == "/test/Vagrantfile"
 
+    @pytest.mark.unit
+    def test_config_deserialize_reuses_instances(self):
+        """Test that identical configs deserialize to the same instance."""
+        config_dict = {
+            "vagrantfile_path": "/test/Vagrantfile",
+            "vagrantfile_env_vars": {"FOO": "bar"},
+        }
+        config = VagrantSandboxEnvironment.config_deserialize(config_dict)
+
+        assert VagrantSandboxEnvironment.config_deserialize(dict(config_dict)) is config
+        assert config.vagrantfile_env_vars == (("FOO", "bar"),)
+
+        reordered = dict(reversed(config_dict.items()))
+        assert VagrantSandboxEnvironment.config_deserialize(reordered) is config
+
+    @pytest.mark.unit
+    def test_config_deserialize_non_json_value(self):
+        """Test that values JSON can't encode still reach pydantic validation."""
+        with pytest.raises(ValidationError):
+            VagrantSandboxEnvironment.config_deserialize({"use_snapshot": object()})
+
 
 class TestDefaultConcurrency:
     """Test the default_concurrency class method."""
@@ -648,8 +1180,8 @@ class TestTimeoutHandling:
 
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_ssh_passes_timeout_to_run_command(self):
-        """Test that ssh() passes timeout through to _run_vagrant_command_async."""
+    async def test_ssh_passes_timeout_to_run_command(self, cached_ssh_config):
+        """Test that ssh() passes timeout through to _run_command_async."""
         mock_process = MockAsyncProcess(returncode=0, stdout="ssh output")
 
         with patch(
@@ -660,10 +1192,12 @@ class TestTimeoutHandling:
 
             assert result["returncode"] == 0
             mock_exec.assert_called_once()
+            args, _ = mock_exec.call_args
+            assert Path(args[0]).name == "ssh"
 
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_ssh_timeout_terminates_hanging_command(self):
+    async def test_ssh_timeout_terminates_hanging_command(self, cached_ssh_config):
         """Test that ssh command is terminated on timeout."""
         mock_process = MockAsyncProcess(hang_forever=True)
 
@@ -683,7 +1217,7 @@ class TestTimeoutHandling:
 
     @pytest.mark.unit
     @pytest.mark.asyncio
-    async def test_ssh_timeout_kills_stubborn_process(self):
+    async def test_ssh_timeout_kills_stubborn_process(self, cached_ssh_config):
         """Test that a process that doesn't respond to terminate() gets killed."""
         mock_process = MockAsyncProcess(resist_terminate=True)
 
@@ -765,13 +1299,17 @@ class TestTimeoutHandling:
         """Test that timeout=0 raises ValueError."""
         mock_process = MockAsyncProcess(returncode=0, stdout="output")
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        with patch(
+            "asyncio.create_subprocess_exec", return_value=mock_process
+        ) as mock_exec:
             vagrant = Vagrant(root="/tmp/test")
 
             with pytest.raises(ValueError) as exc_info:
                 await vagrant._run_vagrant_command_async(["status"], timeout=0)
 
             assert "timeout must be positive" in str(exc_info.value)
+            # Rejected before a process is started, so nothing is left running
+            mock_exec.assert_not_called()
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -1,7 +1,9 @@
+import asyncio
 import pytest
 import sys
 import os
-from unittest.mock import patch
+import time
+from unittest.mock import Mock, patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from vagrantsandbox.vagrant_sandbox_provider import (
@@ -54,6 +56,41 @@ async def test_vm_discovery_error():
         assert vm_names == []
 
 
+@pytest.mark.asyncio
+async def test_vm_discovery_coalesces_concurrent_calls():
+    """Test that concurrent VM discovery shares one `vagrant status` call."""
+    vagrant = Vagrant(root="/tmp")
+
+    def slow_status():
+        time.sleep(0.1)
+        return [{"name": "default", "state": "not_created"}]
+
+    with patch.object(vagrant, "status", Mock(side_effect=slow_status)) as status:
+        results = await asyncio.gather(*(vagrant.get_vm_names() for _ in range(10)))
+        assert results == [["default"]] * 10
+
+        # Later calls are served from the cache
+        assert await vagrant.get_vm_names() == ["default"]
+        assert status.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_vm_discovery_error_not_cached():
+    """Test that a failed VM discovery is retried on the next call."""
+    vagrant = Vagrant(root="/tmp")
+
+    with patch.object(
+        vagrant,
+        "status",
+        side_effect=[
+            Exception("Vagrant not found"),
+            [{"name": "default", "state": "not_created"}],
+        ],
+    ):
+        assert await vagrant.get_vm_names() == []
+        assert await vagrant.get_vm_names() == ["default"]
+
+
 def test_config_primary_vm():
     """Test primary VM configuration."""
     # Test default (no primary specified)
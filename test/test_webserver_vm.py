@@ -17,6 +17,10 @@ from vagrantsandbox.vagrant_sandbox_provider import (
     VagrantSandboxEnvironmentConfig,
 )
 
+WEBSERVER_VAGRANTFILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Vagrantfile.webserver"
+)
+
 
 @task
 def webserver_task() -> Task:
@@ -40,8 +44,7 @@ def webserver_task() -> Task:
         sandbox=SandboxEnvironmentSpec(
             "vagrant",
             VagrantSandboxEnvironmentConfig(
-                vagrantfile_path=(os.path.dirname(os.path.abspath(__file__)))
-                + "/Vagrantfile.webserver",
+                vagrantfile_path=WEBSERVER_VAGRANTFILE,
                 # Note: primary_vm_name will be "attacker" + unique suffix at runtime
                 primary_vm_name="attacker",
             ),
@@ -58,26 +61,17 @@ def test_webserver_vm_config():
         model=get_model(
             "mockllm/model",
             custom_outputs=[
-                # First, discover victim VM's IP
+                # Discover the network and curl the victim's webserver flag
+                # endpoint in a single sandbox exec
                 ModelOutput.for_tool_call(
                     model="mockllm/model",
                     tool_name="bash",
                     tool_arguments={
-                        "cmd": "ip route | grep default | awk '{print $3}'"
+                        "cmd": "ip route | awk '/default/{print $3}'; "
+                        "hostname -I; "
+                        "curl -s http://victim:8080/flag"
                     },
                 ),
-                # Try to find the victim VM on the network
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="bash",
-                    tool_arguments={"cmd": "hostname -I"},
-                ),
-                # Curl the victim's webserver flag endpoint
-                ModelOutput.for_tool_call(
-                    model="mockllm/model",
-                    tool_name="bash",
-                    tool_arguments={"cmd": "curl http://victim:8080/flag"},
-                ),
                 # Submit the flag
                 ModelOutput.for_tool_call(
                     model="mockllm/model",
@@ -1,61 +1,36 @@
+import asyncio
+import uuid
+
 import pytest
 from vagrantsandbox.vagrant_sandbox_provider import (
     VagrantSandboxEnvironment,
-    VagrantSandboxEnvironmentConfig,
     _run_in_executor,
 )
-import os
-
-
-@pytest.mark.vm_required
-@pytest.mark.asyncio
-async def test_sandbox_up_down():
-    sandboxes = await VagrantSandboxEnvironment.sample_init(
-        "test1",
-        VagrantSandboxEnvironmentConfig(
-            vagrantfile_path=(os.path.dirname(os.path.abspath(__file__)))
-            + "/Vagrantfile.basic"
-        ),
-        {},
-    )
-    sandbox = sandboxes["default"]
-    assert isinstance(sandbox, VagrantSandboxEnvironment)
-    try:
-        # Get raw status
-        await _run_in_executor(sandbox.vagrant.status)
-        await sandbox.sample_cleanup(
-            "test1", VagrantSandboxEnvironmentConfig(), {}, False
-        )
 
-    finally:
-        await _run_in_executor(sandbox.vagrant.destroy)
+# These tests reuse the session VM from conftest.py rather than booting their
+# own, so they run on the session event loop and on the worker that owns it.
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="session"),
+    pytest.mark.xdist_group(name="Vagrantfile.basic"),
+]
 
 
 @pytest.mark.vm_required
-@pytest.mark.asyncio
-async def test_readfile_writefile():
-    sandboxes = await VagrantSandboxEnvironment.sample_init(
-        "test1",
-        VagrantSandboxEnvironmentConfig(
-            vagrantfile_path=(os.path.dirname(os.path.abspath(__file__)))
-            + "/Vagrantfile.basic"
-        ),
-        {},
-    )
-    sandbox = sandboxes["default"]
-    assert isinstance(sandbox, VagrantSandboxEnvironment)
-    try:
-        await sandbox.write_file("/tmp/test-contents", "1234")
+async def test_sandbox_status(shared_sandbox):
+    assert isinstance(shared_sandbox, VagrantSandboxEnvironment)
+    # Get raw status
+    await _run_in_executor(shared_sandbox.vagrant.status)
 
-        ls_output = await sandbox.exec(["ls", "/tmp/test-contents"])
-        assert ls_output.stdout != ""
 
-        assert (await sandbox.exec(["cat", "/tmp/test-contents"])).stdout == "1234"
+@pytest.mark.vm_required
+async def test_readfile_writefile(shared_sandbox):
+    path = f"/tmp/{uuid.uuid4().hex}-test-contents"
+    await shared_sandbox.write_file(path, "1234")
 
-        assert await sandbox.read_file("/tmp/test-contents") == "1234"
+    ls_output, cat_output = await asyncio.gather(
+        shared_sandbox.exec(["ls", path]), shared_sandbox.exec(["cat", path])
+    )
+    assert ls_output.stdout != ""
+    assert cat_output.stdout == "1234"
 
-        await sandbox.sample_cleanup(
-            "test1", VagrantSandboxEnvironmentConfig(), {}, False
-        )
-    finally:
-        await _run_in_executor(sandbox.vagrant.destroy)
+    assert await shared_sandbox.read_file(path) == "1234"